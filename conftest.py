@@ -0,0 +1,85 @@
+import os
+import shutil
+import tempfile
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest
+from filelock import FileLock
+from livekit.agents import llm
+from livekit.plugins import openai
+from llama_index.core import Settings, SimpleDirectoryReader, StorageContext, VectorStoreIndex
+from llama_index.embeddings.openai import OpenAIEmbedding
+
+from index_cache import dump_index, load_index
+from price_index import PriceIndex, load_price_index
+from vector_store import QuantizedVectorStore
+
+THIS_DIR = Path(__file__).parent
+# kept apart from retrieval.py's storage, which persists a SimpleVectorStore
+PERSIST_DIR = THIS_DIR / "test-retrieval-storage"
+
+
+# texts per embeddings request; at the default 1024-token chunk size this keeps a
+# request under OpenAI's 300k-token cap (the default batch is 100)
+EMBED_BATCH_SIZE = 256
+
+
+def _build_index(persist_dir: Path) -> None:
+    # load the documents, parsing files in parallel when there is more than one
+    reader = SimpleDirectoryReader(THIS_DIR / "data")
+    documents = reader.load_data(num_workers=min(os.cpu_count() or 1, len(reader.input_files)))
+    # embed in large batches, sent concurrently
+    storage_context = StorageContext.from_defaults(vector_store=QuantizedVectorStore())
+    index = VectorStoreIndex.from_documents(
+        documents,
+        storage_context=storage_context,
+        embed_model=OpenAIEmbedding(embed_batch_size=EMBED_BATCH_SIZE),
+        use_async=True,
+        show_progress=True,
+    )
+    index.storage_context.persist(persist_dir=persist_dir)
+    dump_index(index, persist_dir)
+    PriceIndex.from_index(index).persist(persist_dir)
+
+
+@pytest.fixture(scope="session")
+def index() -> VectorStoreIndex:
+    # only the first xdist worker to take the lock builds, the others wait and load
+    with FileLock(f"{PERSIST_DIR}.lock"):
+        if not PERSIST_DIR.exists():
+            # build beside PERSIST_DIR (a rename can't cross filesystems) and publish
+            # with one rename, so an interrupted build never leaves a partial index
+            build_dir = tempfile.mkdtemp(dir=THIS_DIR, prefix=f".{PERSIST_DIR.name}-")
+            try:
+                _build_index(Path(build_dir))
+                os.rename(build_dir, PERSIST_DIR)
+            finally:
+                shutil.rmtree(build_dir, ignore_errors=True)
+
+    # load the existing index
+    return load_index(PERSIST_DIR, QuantizedVectorStore.from_persist_dir)
+
+
+@pytest.fixture(scope="session")
+def price_index(index: VectorStoreIndex) -> PriceIndex:
+    return load_price_index(index, PERSIST_DIR)
+
+
+@pytest.fixture(scope="session")
+async def llm_client() -> AsyncIterator[llm.LLM]:
+    async with openai.LLM(model="gpt-4o-mini") as llm_client:
+        yield llm_client
+
+
+@pytest.fixture(scope="session")
+async def warmup(llm_client: llm.LLM) -> None:
+    # pay DNS/TLS setup and the clients' lazy initialization once, on the session
+    # loop the tests run on, instead of inside the first test. llm_client both
+    # answers (RetrievalAgent is handed it) and judges, Settings.embed_model embeds
+    # the retriever's queries
+    chat_ctx = llm.ChatContext()
+    chat_ctx.add_message(role="user", content="ping")
+    async for _ in llm_client.chat(chat_ctx=chat_ctx):
+        pass
+    await Settings.embed_model.aget_text_embedding("warmup")
@@ -0,0 +1,69 @@
+import os
+import pickle
+from collections.abc import Callable
+
+from llama_index.core import StorageContext, VectorStoreIndex, load_index_from_storage
+from llama_index.core.vector_stores.simple import DEFAULT_VECTOR_STORE
+from llama_index.core.vector_stores.types import BasePydanticVectorStore
+
+INDEX_PICKLE_FNAME = "index.pkl"
+
+
+def dump_index(index: VectorStoreIndex, persist_dir: str | os.PathLike) -> None:
+    """Pickle the index's struct and stores, except the vector store, next to its
+    persisted JSON.
+
+    The vector store is re-attached by load_index through load_vector_store, so it
+    loads from whatever it persisted (memory-mapped .npy for QuantizedVectorStore).
+    Pickling it would rebuild SimpleVectorStore's embeddings as per-value Python
+    floats, and pydantic components drop their private attributes when unpickled.
+    """
+    storage_context = index.storage_context
+    vector_stores = dict(storage_context.vector_stores)
+    del vector_stores[DEFAULT_VECTOR_STORE]
+    state = {
+        "index_struct": index.index_struct,
+        "docstore": storage_context.docstore,
+        "index_store": storage_context.index_store,
+        "graph_store": storage_context.graph_store,
+        "property_graph_store": storage_context.property_graph_store,
+        "vector_stores": vector_stores,
+    }
+    # written aside and renamed into place, a concurrent load never sees half a file
+    path = os.path.join(persist_dir, INDEX_PICKLE_FNAME)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_index(
+    persist_dir: str | os.PathLike,
+    load_vector_store: Callable[[str | os.PathLike], BasePydanticVectorStore],
+) -> VectorStoreIndex:
+    """Load the pickle written by dump_index, or the persisted JSON if that fails.
+
+    load_vector_store(persist_dir) loads the vector store, which isn't pickled.
+    """
+    vector_store = load_vector_store(persist_dir)
+    try:
+        with open(os.path.join(persist_dir, INDEX_PICKLE_FNAME), "rb") as f:
+            state = pickle.load(f)
+    except Exception:
+        # missing, or written by a llama-index version whose classes have changed;
+        # rewrite it so the next load is fast
+        storage_context = StorageContext.from_defaults(
+            vector_store=vector_store, persist_dir=persist_dir
+        )
+        index = load_index_from_storage(storage_context)
+        dump_index(index, persist_dir)
+        return index
+
+    storage_context = StorageContext(
+        docstore=state["docstore"],
+        index_store=state["index_store"],
+        vector_stores={**state["vector_stores"], DEFAULT_VECTOR_STORE: vector_store},
+        graph_store=state["graph_store"],
+        property_graph_store=state["property_graph_store"],
+    )
+    return VectorStoreIndex(index_struct=state["index_struct"], storage_context=storage_context)
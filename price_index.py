@@ -0,0 +1,96 @@
+import os
+import re
+from collections.abc import Iterable
+from typing import Optional
+
+import numpy as np
+from llama_index.core import VectorStoreIndex
+from llama_index.core.schema import BaseNode
+
+PRICES_FNAME = "price_cents.npy"
+PRICE_NODE_IDS_FNAME = "price_node_ids.npy"
+
+# the catalog is JSON, so prices appear in node text as `"min_price": 8.99`
+CATALOG_PRICE_RE = re.compile(r'"(?:min|max)_price":\s*(\d+(?:\.\d{1,2})?)')
+# only unambiguous phrasings short-circuit retrieval, any other "$N" ("over $20",
+# "a $5 coupon") is left to the vector retriever. The amount must not run on into
+# more digits ("$5.999", "$1,000"), but may end a sentence ("a budget of $9.")
+_AMOUNT = r"\$\s?(?P<amount>\d+(?:\.\d{1,2})?)(?![.,]?\d)"
+EXACT_PRICE_RE = re.compile(rf"\bexactly\s+{_AMOUNT}", re.IGNORECASE)
+BUDGET_RE = re.compile(
+    rf"\b(?:(?P<strict>under|below|less\s+than)|budget(?:\s+of|\s+is)?|up\s+to|at\s+most"
+    rf"|no\s+more\s+than)\s+{_AMOUNT}",
+    re.IGNORECASE,
+)
+BUDGET_AFTER_RE = re.compile(rf"{_AMOUNT}\s+(?:or\s+less|or\s+under|budget)\b", re.IGNORECASE)
+
+
+def _to_cents(price: str) -> int:
+    return round(float(price) * 100)
+
+
+class PriceIndex:
+    """Sorted price -> node id arrays for answering price lookups without a vector scan.
+
+    An exact price ("exactly $5.99") is two binary searches, a budget ("a budget of
+    $9") is one search for the prefix of prices at or below it.
+    """
+
+    def __init__(self, price_cents: np.ndarray, node_ids: np.ndarray):
+        order = np.argsort(price_cents, kind="stable")
+        self.price_cents = price_cents[order]
+        self.node_ids = node_ids[order]
+
+    @classmethod
+    def from_nodes(cls, nodes: Iterable[BaseNode]) -> "PriceIndex":
+        prices: list[int] = []
+        node_ids: list[str] = []
+        for node in nodes:
+            # a chunk holds several products, and a product may list two prices
+            for cents in {_to_cents(p) for p in CATALOG_PRICE_RE.findall(node.get_content())}:
+                prices.append(cents)
+                node_ids.append(node.node_id)
+        return cls(np.array(prices, dtype=np.int64), np.array(node_ids, dtype=str))
+
+    @classmethod
+    def from_index(cls, index: VectorStoreIndex) -> "PriceIndex":
+        # stores that keep text hold the nodes themselves, the others leave them in the docstore
+        if index.vector_store.stores_text:
+            nodes = index.vector_store.get_nodes()
+        else:
+            nodes = index.docstore.docs.values()
+        return cls.from_nodes(nodes)
+
+    def persist(self, persist_dir: str | os.PathLike) -> None:
+        np.save(os.path.join(persist_dir, PRICES_FNAME), self.price_cents)
+        np.save(os.path.join(persist_dir, PRICE_NODE_IDS_FNAME), self.node_ids)
+
+    @classmethod
+    def from_persist_dir(cls, persist_dir: str | os.PathLike) -> "PriceIndex":
+        return cls(
+            np.load(os.path.join(persist_dir, PRICES_FNAME)),
+            np.load(os.path.join(persist_dir, PRICE_NODE_IDS_FNAME)),
+        )
+
+    def lookup(self, query: str) -> Optional[list[str]]:
+        """Node ids for an exact price or budget in `query`, None for any other query."""
+        if match := EXACT_PRICE_RE.search(query):
+            cents = _to_cents(match["amount"])
+            lo = np.searchsorted(self.price_cents, cents)
+            hi = np.searchsorted(self.price_cents, cents, side="right")
+        elif match := BUDGET_RE.search(query) or BUDGET_AFTER_RE.search(query):
+            cents = _to_cents(match["amount"])
+            lo = 0
+            # "under $X" excludes X itself, "up to $X" includes it
+            strict = match.groupdict().get("strict")
+            hi = np.searchsorted(self.price_cents, cents, side="left" if strict else "right")
+        else:
+            return None
+        return list(dict.fromkeys(self.node_ids[lo:hi].tolist()))
+
+
+def load_price_index(index: VectorStoreIndex, persist_dir: str | os.PathLike) -> PriceIndex:
+    # storage persisted before the price index existed gets one built from its nodes
+    if os.path.exists(os.path.join(persist_dir, PRICES_FNAME)):
+        return PriceIndex.from_persist_dir(persist_dir)
+    return PriceIndex.from_index(index)
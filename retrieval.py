@@ -1,13 +1,10 @@
+from functools import cache
 from pathlib import Path
 
 from dotenv import load_dotenv
-from llama_index.core import (
-    SimpleDirectoryReader,
-    StorageContext,
-    VectorStoreIndex,
-    load_index_from_storage,
-)
-from llama_index.core.schema import MetadataMode
+from llama_index.core import SimpleDirectoryReader, StorageContext, VectorStoreIndex
+from llama_index.core.retrievers import BaseRetriever, VectorIndexRetriever
+from llama_index.core.schema import MetadataMode, NodeWithScore
 
 from livekit.agents import (
     Agent,
@@ -21,41 +18,91 @@ from livekit.agents import (
 from livekit.agents.voice.agent import ModelSettings
 from livekit.plugins import deepgram, openai, silero
 
+from index_cache import dump_index, load_index
+from price_index import PriceIndex, load_price_index
+from vector_store import FastSimpleVectorStore
+
 import json
 
 load_dotenv()
 
-# check if storage already exists
 THIS_DIR = Path(__file__).parent
 PERSIST_DIR = THIS_DIR / "retrieval-engine-storage"
-if not PERSIST_DIR.exists():
-    # load the documents and create the index
-    documents = SimpleDirectoryReader(THIS_DIR / "data").load_data()
-    index = VectorStoreIndex.from_documents(documents)
-    # store it for later
-    index.storage_context.persist(persist_dir=PERSIST_DIR)
-else:
-    # load the existing index
-    storage_context = StorageContext.from_defaults(persist_dir=PERSIST_DIR)
-    index = load_index_from_storage(storage_context)
-
-data = json.load(open("data/sirius_raw_data_clean.json"))
-print(f"Raw product count: {len(data)}")
+
+
+@cache
+def load_storage() -> tuple[VectorStoreIndex, PriceIndex]:
+    # built on first use rather than at import, so importing RetrievalAgent (as the
+    # tests do) never embeds the catalog or writes PERSIST_DIR
+    data = json.load(open(THIS_DIR / "data/sirius_raw_data_clean.json"))
+    print(f"Raw product count: {len(data)}")
+
+    # check if storage already exists
+    if not PERSIST_DIR.exists():
+        # load the documents and create the index
+        documents = SimpleDirectoryReader(THIS_DIR / "data").load_data()
+        storage_context = StorageContext.from_defaults(vector_store=FastSimpleVectorStore())
+        index = VectorStoreIndex.from_documents(documents, storage_context=storage_context)
+        # store it for later
+        index.storage_context.persist(persist_dir=PERSIST_DIR)
+        dump_index(index, PERSIST_DIR)
+        price_index = PriceIndex.from_index(index)
+        price_index.persist(PERSIST_DIR)
+    else:
+        # load the existing index
+        index = load_index(PERSIST_DIR, FastSimpleVectorStore.from_persist_dir)
+        price_index = load_price_index(index, PERSIST_DIR)
+    return index, price_index
+
+
+async def retrieve_context(
+    index: VectorStoreIndex,
+    retriever: BaseRetriever,
+    query: str,
+    price_index: PriceIndex | None = None,
+) -> list[NodeWithScore] | None:
+    """Nodes to answer `query` with, or None if it asks for a price no product has."""
+    # a query naming a price only needs to rank the nodes listing that price
+    node_ids = price_index.lookup(query) if price_index else None
+    if node_ids is None:
+        return await retriever.aretrieve(query)
+    if not node_ids:
+        return None
+    # not index.as_retriever(), which always passes node_ids itself
+    return await VectorIndexRetriever(index, node_ids=node_ids).aretrieve(query)
+
+
+@cache
+def _load_vad() -> silero.VAD:
+    # loading the ONNX model is the expensive part of building an agent, share it
+    return silero.VAD.load()
+
 
 class RetrievalAgent(Agent):
-    def __init__(self, index: VectorStoreIndex):
+    def __init__(
+        self,
+        index: VectorStoreIndex,
+        retriever: BaseRetriever | None = None,
+        price_index: PriceIndex | None = None,
+        llm_client: llm.LLM | None = None,
+    ):
         super().__init__(
             instructions=(
                 "You are a voice assistant created by LiveKit. Your interface "
                 "with users will be voice. You should use short and concise "
                 "responses, and avoiding usage of unpronouncable punctuation."
             ),
-            vad=silero.VAD.load(),
+            vad=_load_vad(),
             stt=deepgram.STT(),
-            llm=openai.LLM(),
+            # the agent's llm takes precedence over the session's, so a shared client
+            # has to be passed in here to be used
+            llm=llm_client or openai.LLM(),
             tts=openai.TTS(),
         )
         self.index = index
+        # agents carry per-session chat state, the retriever can be shared between them
+        self.retriever = retriever or index.as_retriever()
+        self.price_index = price_index
 
     async def llm_node(
         self,
@@ -68,11 +115,12 @@ class RetrievalAgent(Agent):
         user_query = user_msg.text_content
         assert user_query is not None
 
-        retriever = self.index.as_retriever()
-        nodes = await retriever.aretrieve(user_query)
+        nodes = await retrieve_context(self.index, self.retriever, user_query, self.price_index)
 
         instructions = "Context that might help answer the user's question:"
-        for node in nodes:
+        if nodes is None:
+            instructions += "\n\nNo products in the catalog match the price the user asked about."
+        for node in nodes or []:
             node_content = node.get_content(metadata_mode=MetadataMode.LLM)
             instructions += f"\n\n{node_content}"
 
@@ -95,7 +143,8 @@ class RetrievalAgent(Agent):
 async def entrypoint(ctx: JobContext):
     await ctx.connect(auto_subscribe=AutoSubscribe.AUDIO_ONLY)
 
-    agent = RetrievalAgent(index)
+    index, price_index = load_storage()
+    agent = RetrievalAgent(index, price_index=price_index)
     session = AgentSession()
     await session.start(agent=agent, room=ctx.room)
 
@@ -1,89 +1,49 @@
 import pytest
 from livekit.agents import AgentSession, llm
 from livekit.agents.voice.run_result import mock_tools
-from livekit.plugins import openai
 
+from price_index import PriceIndex
 from retrieval import RetrievalAgent
 
-from pathlib import Path
-from llama_index.core import (
-    SimpleDirectoryReader,
-    StorageContext,
-    VectorStoreIndex,
-    load_index_from_storage,
-)
-
-
-THIS_DIR = Path(__file__).parent
-PERSIST_DIR = THIS_DIR / "retrieval-engine-storage"
-if not PERSIST_DIR.exists():
-    # load the documents and create the index
-    documents = SimpleDirectoryReader(THIS_DIR / "data").load_data()
-    index = VectorStoreIndex.from_documents(documents)
-    # store it for later
-    index.storage_context.persist(persist_dir=PERSIST_DIR)
-else:
-    # load the existing index
-    storage_context = StorageContext.from_defaults(persist_dir=PERSIST_DIR)
-    index = load_index_from_storage(storage_context)
-
-
-def _llm() -> llm.LLM:
-    return openai.LLM(model="gpt-4o-mini")
-
-
-@pytest.mark.asyncio
-async def test_offers_assistance() -> None:
-    """Evaluation of the agent's friendly nature."""
-    async with (
-        _llm() as llm,
-        AgentSession(llm=llm) as session,
-    ):
-        await session.start(RetrievalAgent(index))
-
-        # Run an agent turn following the user's greeting
-        result = await session.run(user_input="Hello")
-
-        # Evaluate the agent's response for friendliness
-        await (
-            result.expect.next_event()
-            .is_message(role="assistant")
-            .judge(
-                llm,
-                intent="""
-                Greets the user in a friendly manner.
+from llama_index.core import VectorStoreIndex
+from llama_index.core.retrievers import BaseRetriever
 
-                Optional context that may or may not be included:
-                - Offer of assistance with any request the user may have
-                - Other small talk or chit chat is acceptable, so long as it is friendly and not too intrusive
-                """,
-            )
-        )
 
-        # Ensures there are no function calls or other unexpected events
-        result.expect.no_more_events()
+@pytest.fixture(scope="session")
+def retriever(index: VectorStoreIndex) -> BaseRetriever:
+    return index.as_retriever()
 
 
+@pytest.fixture
+def agent(
+    warmup: None,
+    llm_client: llm.LLM,
+    index: VectorStoreIndex,
+    retriever: BaseRetriever,
+    price_index: PriceIndex,
+) -> RetrievalAgent:
+    # an agent keeps the chat context of the session it runs in, so each test
+    # gets a fresh one around the shared retriever
+    return RetrievalAgent(index, retriever, price_index, llm_client=llm_client)
 
-@pytest.mark.asyncio
-async def test_product_search_and_detail() -> None:
-    """Test for catalog searching and product detail retrieval"""
-    async with (
-        _llm() as llm,
-        AgentSession(llm=llm) as session,
-    ):
-        await session.start(RetrievalAgent(index))
 
-        # Run an agent turn following the user's greeting
-        result = await session.run(user_input="Tell me about the Dungeons & Dragons Wood Dice Vault")
+CASES = [
+    # Evaluation of the agent's friendly nature.
+    pytest.param(
+        "Hello",
+        """
+                Greets the user in a friendly manner.
 
-        # Evaluate the agent's response for friendliness
-        await (
-            result.expect.next_event()
-            .is_message(role="assistant")
-            .judge(
-                llm,
-                intent="""
+                Optional context that may or may not be included:
+                - Offer of assistance with any request the user may have
+                - Other small talk or chit chat is acceptable, so long as it is friendly and not too intrusive
+                """,
+        id="offers_assistance",
+    ),
+    # Test for catalog searching and product detail retrieval
+    pytest.param(
+        "Tell me about the Dungeons & Dragons Wood Dice Vault",
+        """
                 Provides an accurate description of the "Dungeons & Dragons Wood Dice Vault"
                 based on catalog data.
 
@@ -101,82 +61,30 @@ async def test_product_search_and_detail() -> None:
                 - Invent unsupported features
                 - Confuse it with unrelated products
                 """,
-            )
-        )
-
-        # Ensures there are no function calls or other unexpected events
-        result.expect.no_more_events()
-
-
-@pytest.mark.asyncio
-async def test_search_product_by_description() -> None:
-    """Test if voice agent is able to find a product based on the description"""
-    async with (
-        _llm() as llm,
-        AgentSession(llm=llm) as session,
-    ):
-        await session.start(RetrievalAgent(index))
-
-        result = await session.run(user_input="I'm looking for a die set with twinkling black and clear resin holding three leaf clovers. Are there any sets like this? What might this dice set be called?")
-
-        await (
-            result.expect.next_event()
-            .is_message(role="assistant")
-            .judge(
-                llm,
-                intent="""
+        id="product_search_and_detail",
+    ),
+    # Test if voice agent is able to find a product based on the description
+    pytest.param(
+        "I'm looking for a die set with twinkling black and clear resin holding three leaf clovers. Are there any sets like this? What might this dice set be called?",
+        """
                 Identifies the set name (16mm Clubs D6 Dice Set) based on context. 
                 If no exact match exists, says so and offers to browse similar clover-themed products.
                 """,
-            )
-        )
-
-        # Ensures there are no function calls or other unexpected events
-        result.expect.no_more_events()
-
-@pytest.mark.asyncio
-async def test_search_product_by_price() -> None:
-    """Test if voice agent is able to find a product based on the price"""
-    async with (
-        _llm() as llm,
-        AgentSession(llm=llm) as session,
-    ):
-        await session.start(RetrievalAgent(index))
-
-        result = await session.run(user_input="I'm looking for a die set that is exactly $5.99")
-
-        await (
-            result.expect.next_event()
-            .is_message(role="assistant")
-            .judge(
-                llm,
-                intent="""
+        id="search_product_by_description",
+    ),
+    # Test if voice agent is able to find a product based on the price
+    pytest.param(
+        "I'm looking for a die set that is exactly $5.99",
+        """
                 Identifies the set name (Solid Black + Gold ink Dice Set) based on context. 
                 If no exact match exists, says so.
                 """,
-            )
-        )
-
-        # Ensures there are no function calls or other unexpected events
-        result.expect.no_more_events()
-
-@pytest.mark.asyncio
-async def test_recommend_products_given_budget() -> None:
-    """Test if voice agent is able to recommend a few products given a budget"""
-    async with (
-        _llm() as llm,
-        AgentSession(llm=llm) as session,
-    ):
-        await session.start(RetrievalAgent(index))
-
-        result = await session.run(user_input="I have a budget of $9. What can I buy.")
-
-        await (
-            result.expect.next_event()
-            .is_message(role="assistant")
-            .judge(
-                llm,
-                intent="""
+        id="search_product_by_price",
+    ),
+    # Test if voice agent is able to recommend a few products given a budget
+    pytest.param(
+        "I have a budget of $9. What can I buy.",
+        """
                 Identifies a few products that exist in the store.
 
                 Does not:
@@ -186,53 +94,20 @@ async def test_recommend_products_given_budget() -> None:
 
                 If no products are less than or equal to the budget given, tell the custumer.
                 """,
-            )
-        )
-
-        # Ensures there are no function calls or other unexpected events
-        result.expect.no_more_events()
-
-@pytest.mark.asyncio
-async def test_context_price() -> None:
-    """Evaluation of the voice agent to get the correct pricing"""
-    async with (
-        _llm() as llm,
-        AgentSession(llm=llm) as session,
-    ):
-        await session.start(RetrievalAgent(index))
-
-        result = await session.run(user_input="How much is the Crimson Grove Limited Edition Dice Set?")
-
-        await (
-            result.expect.next_event()
-            .is_message(role="assistant")
-            .judge(
-                llm,
-                intent="""
+        id="recommend_products_given_budget",
+    ),
+    # Evaluation of the voice agent to get the correct pricing
+    pytest.param(
+        "How much is the Crimson Grove Limited Edition Dice Set?",
+        """
                 Gives the price $150 for the Crimson Grove Limited Edition Dice Set.
                 """,
-            )
-        )
-
-        result.expect.no_more_events()
-
-@pytest.mark.asyncio
-async def test_unknown_product_no_hallucination() -> None:
-    """Evaluation of the agent's ability to refuse to answer when it doesn't know something."""
-    async with (
-        _llm() as llm,
-        AgentSession(llm=llm) as session,
-    ):
-        await session.start(RetrievalAgent(index))
-
-        result = await session.run(user_input="Do you carry the Bearworks Dice?")
-
-        await (
-            result.expect.next_event()
-            .is_message(role="assistant")
-            .judge(
-                llm,
-                intent="""
+        id="context_price",
+    ),
+    # Evaluation of the agent's ability to refuse to answer when it doesn't know something.
+    pytest.param(
+        "Do you carry the Bearworks Dice?",
+        """
                 Does not claim to know the product and give information about it.
 
                 The response should not:
@@ -247,57 +122,21 @@ async def test_unknown_product_no_hallucination() -> None:
 
                 The core requirement is simply that the agent doesn't provide or claim to know the product.
                 """,
-            )
-        )
-
-        result.expect.no_more_events()
-
-
-@pytest.mark.asyncio
-async def test_suggest_similar_product() -> None:
-    """Evaluation of the agent's ability suggest a similar product if the one the client is looking for is out of stock"""
-    async with (
-        _llm() as llm,
-        AgentSession(llm=llm) as session,
-    ):
-        await session.start(RetrievalAgent(index))
-
-        result = await session.run(user_input="Do you carry the Bearworks Dice?")
-
-        await (
-            result.expect.next_event()
-            .is_message(role="assistant")
-            .judge(
-                llm,
-                intent="""
+        id="unknown_product_no_hallucination",
+    ),
+    # Evaluation of the agent's ability suggest a similar product if the one the client is looking for is out of stock
+    pytest.param(
+        "Do you carry the Bearworks Dice?",
+        """
                 States that the Bearworks Dice doesn't exist and proactively suggests at least one more similar dice. 
                 For example another die with animals. Offers to notify when back in stock or help picking a substitute.
                 """,
-            )
-        )
-
-        result.expect.no_more_events()
-
-
-@pytest.mark.asyncio
-async def test_grounding() -> None:
-    """Evaluation of the agent's ability to refuse to answer when it doesn't know something."""
-    async with (
-        _llm() as llm,
-        AgentSession(llm=llm) as session,
-    ):
-        await session.start(RetrievalAgent(index))
-
-        # Run an agent turn following the user's request for information about their birth city (not known by the agent)
-        result = await session.run(user_input="What city was I born in?")
-
-        # Evaluate the agent's response for a refusal
-        await (
-            result.expect.next_event()
-            .is_message(role="assistant")
-            .judge(
-                llm,
-                intent="""
+        id="suggest_similar_product",
+    ),
+    # Evaluation of the agent's ability to refuse to answer when it doesn't know something.
+    pytest.param(
+        "What city was I born in?",
+        """
                 Does not claim to know or provide the user's birthplace information.
 
                 The response should not:
@@ -314,8 +153,20 @@ async def test_grounding() -> None:
 
                 The core requirement is simply that the agent doesn't provide or claim to know the user's birthplace.
                 """,
-            )
-        )
+        id="grounding",
+    ),
+]
+
+
+@pytest.mark.parametrize("user_input,intent", CASES)
+async def test_agent(llm_client: llm.LLM, agent: RetrievalAgent, user_input: str, intent: str) -> None:
+    async with AgentSession(llm=llm_client) as session:
+        await session.start(agent)
+
+        result = await session.run(user_input=user_input)
+
+        # Evaluate the agent's response against the case's intent
+        await result.expect.next_event().is_message(role="assistant").judge(llm_client, intent=intent)
 
         # Ensures there are no function calls or other unexpected events
         result.expect.no_more_events()
@@ -0,0 +1,89 @@
+import os
+
+import numpy as np
+import pytest
+from llama_index.core import Settings, StorageContext, VectorStoreIndex
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.schema import TextNode
+
+import index_cache
+from index_cache import INDEX_PICKLE_FNAME, dump_index, load_index
+from vector_store import FastSimpleVectorStore, QuantizedVectorStore
+
+DIM = 8
+
+
+@pytest.fixture(autouse=True)
+def embed_model(monkeypatch: pytest.MonkeyPatch) -> None:
+    # loaded indexes take Settings.embed_model, keep them offline too
+    monkeypatch.setattr(Settings, "_embed_model", MockEmbedding(embed_dim=DIM))
+
+
+@pytest.fixture(params=[FastSimpleVectorStore, QuantizedVectorStore])
+def store_cls(request) -> type:
+    return request.param
+
+
+@pytest.fixture
+def persisted(store_cls: type, tmp_path) -> tuple[VectorStoreIndex, str]:
+    embeddings = np.random.default_rng(0).normal(size=(20, DIM))
+    nodes = [
+        TextNode(id_=f"n{i}", text=f"node {i}", embedding=e.tolist())
+        for i, e in enumerate(embeddings)
+    ]
+    storage_context = StorageContext.from_defaults(vector_store=store_cls())
+    index = VectorStoreIndex(nodes, storage_context=storage_context)
+    index.storage_context.persist(persist_dir=tmp_path)
+    return index, str(tmp_path)
+
+
+class _Loader:
+    """load_vector_store callback that counts its calls."""
+
+    def __init__(self, store_cls: type):
+        self.store_cls = store_cls
+        self.calls = 0
+
+    def __call__(self, persist_dir):
+        self.calls += 1
+        return self.store_cls.from_persist_dir(persist_dir)
+
+
+def _retrieved(index: VectorStoreIndex) -> list[tuple[str, str]]:
+    nodes = index.as_retriever(similarity_top_k=3).retrieve("query")
+    return [(n.node_id, n.get_content()) for n in nodes]
+
+
+def test_pickle_round_trip(persisted, store_cls: type) -> None:
+    index, persist_dir = persisted
+    dump_index(index, persist_dir)
+    load_vector_store = _Loader(store_cls)
+    loaded = load_index(persist_dir, load_vector_store)
+    # the vector store isn't pickled, it's re-attached through the callback
+    assert load_vector_store.calls == 1
+    assert isinstance(loaded.vector_store, store_cls)
+    assert loaded.index_struct.index_id == index.index_struct.index_id
+    assert _retrieved(loaded) == _retrieved(index)
+
+
+@pytest.mark.parametrize("pickle_bytes", [None, b"not a pickle"])
+def test_falls_back_to_storage(persisted, store_cls: type, pickle_bytes: bytes | None) -> None:
+    index, persist_dir = persisted
+    if pickle_bytes is not None:
+        with open(os.path.join(persist_dir, INDEX_PICKLE_FNAME), "wb") as f:
+            f.write(pickle_bytes)
+    loaded = load_index(persist_dir, _Loader(store_cls))
+    assert isinstance(loaded.vector_store, store_cls)
+    assert _retrieved(loaded) == _retrieved(index)
+
+
+def test_fallback_writes_pickle(
+    persisted, store_cls: type, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    index, persist_dir = persisted
+    load_index(persist_dir, _Loader(store_cls))
+    assert os.path.exists(os.path.join(persist_dir, INDEX_PICKLE_FNAME))
+    # the next load is served from the pickle alone
+    monkeypatch.setattr(index_cache, "load_index_from_storage", None)
+    loaded = load_index(persist_dir, _Loader(store_cls))
+    assert _retrieved(loaded) == _retrieved(index)
@@ -0,0 +1,79 @@
+import json
+
+import numpy as np
+import pytest
+from llama_index.core.schema import TextNode
+
+from price_index import PriceIndex, load_price_index
+
+
+def _node(node_id: str, *prices: tuple[float, float]) -> TextNode:
+    products = [{"min_price": lo, "max_price": hi} for lo, hi in prices]
+    return TextNode(id_=node_id, text=json.dumps(products, indent=2))
+
+
+@pytest.fixture
+def price_index() -> PriceIndex:
+    return PriceIndex.from_nodes(
+        [
+            _node("a", (5.99, 5.99)),
+            _node("b", (8.99, 8.99), (15.99, 15.99)),
+            _node("c", (9.0, 12.5)),
+            _node("d", (150.0, 150.0)),
+        ]
+    )
+
+
+def test_from_nodes_sorts_and_dedupes(price_index: PriceIndex) -> None:
+    assert price_index.price_cents.tolist() == [599, 899, 900, 1250, 1599, 15000]
+    assert price_index.node_ids.tolist() == ["a", "b", "c", "c", "b", "d"]
+
+
+@pytest.mark.parametrize(
+    "query,expected",
+    [
+        ("I'm looking for a die set that is exactly $5.99", ["a"]),
+        ("exactly $ 12.50", ["c"]),
+        ("Anything for exactly $6?", []),
+        ("I have a budget of $9. What can I buy.", ["a", "b", "c"]),
+        ("my budget is $8.99", ["a", "b"]),
+        ("something under $6", ["a"]),
+        ("something under $8.99", ["a"]),
+        ("below $5.99", []),
+        ("less than $9", ["a", "b"]),
+        ("at most $9", ["a", "b", "c"]),
+        ("up to $8.99", ["a", "b"]),
+        ("up to $1000", ["a", "b", "c", "d"]),
+        ("$5 or less", []),
+        ("$8.99 or less", ["a", "b"]),
+        ("a $10 budget", ["a", "b", "c"]),
+    ],
+)
+def test_lookup(price_index: PriceIndex, query: str, expected: list[str]) -> None:
+    assert price_index.lookup(query) == expected
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "How much is the Crimson Grove Limited Edition Dice Set?",
+        "anything over $20",
+        "I have $1000",
+        "I have a $5 coupon, tell me about the Wood Dice Vault",
+        "what's on a budget?",
+        "exactly $5.999",
+        "up to $1,000",
+    ],
+)
+def test_lookup_leaves_other_queries_to_the_retriever(
+    price_index: PriceIndex, query: str
+) -> None:
+    assert price_index.lookup(query) is None
+
+
+def test_persist_roundtrip(price_index: PriceIndex, tmp_path) -> None:
+    price_index.persist(tmp_path)
+    loaded = load_price_index(None, tmp_path)
+    np.testing.assert_array_equal(loaded.price_cents, price_index.price_cents)
+    np.testing.assert_array_equal(loaded.node_ids, price_index.node_ids)
+    assert loaded.lookup("exactly $150") == ["d"]
@@ -0,0 +1,68 @@
+import json
+from pathlib import Path
+
+import pytest
+from llama_index.core import StorageContext, VectorStoreIndex
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.schema import TextNode
+
+from price_index import CATALOG_PRICE_RE, PriceIndex
+from retrieval import retrieve_context
+from vector_store import FastSimpleVectorStore, QuantizedVectorStore
+
+CATALOG = Path(__file__).parent / "data" / "sirius_raw_data_clean.json"
+
+
+def _prices(node) -> set[float]:
+    return {float(p) for p in CATALOG_PRICE_RE.findall(node.get_content())}
+
+
+@pytest.fixture(scope="module", params=[FastSimpleVectorStore, QuantizedVectorStore])
+def index(request) -> VectorStoreIndex:
+    # one node per product, embedded offline
+    products = json.loads(CATALOG.read_text())
+    nodes = [TextNode(text=json.dumps(product, indent=2)) for product in products]
+    storage_context = StorageContext.from_defaults(vector_store=request.param())
+    return VectorStoreIndex(
+        nodes, storage_context=storage_context, embed_model=MockEmbedding(embed_dim=8)
+    )
+
+
+@pytest.fixture(scope="module")
+def price_index(index: VectorStoreIndex) -> PriceIndex:
+    return PriceIndex.from_index(index)
+
+
+async def test_exact_price(index: VectorStoreIndex, price_index: PriceIndex) -> None:
+    nodes = await retrieve_context(
+        index, index.as_retriever(), "I'm looking for a die set that is exactly $5.99", price_index
+    )
+    assert nodes
+    assert all(5.99 in _prices(node) for node in nodes)
+
+
+async def test_budget(index: VectorStoreIndex, price_index: PriceIndex) -> None:
+    nodes = await retrieve_context(
+        index, index.as_retriever(), "I have a budget of $9. What can I buy.", price_index
+    )
+    assert nodes
+    assert all(min(_prices(node)) <= 9 for node in nodes)
+
+
+async def test_no_product_at_price(index: VectorStoreIndex, price_index: PriceIndex) -> None:
+    nodes = await retrieve_context(
+        index, index.as_retriever(), "Do you have anything for exactly $0.01?", price_index
+    )
+    assert nodes is None
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["How much is the Crimson Grove Limited Edition Dice Set?"],
+)
+async def test_falls_back_to_retriever(
+    index: VectorStoreIndex, price_index: PriceIndex, query: str
+) -> None:
+    retriever = index.as_retriever()
+    nodes = await retrieve_context(index, retriever, query, price_index)
+    assert [n.node_id for n in nodes] == [n.node_id for n in await retriever.aretrieve(query)]
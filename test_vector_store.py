@@ -0,0 +1,176 @@
+import numpy as np
+import pytest
+from llama_index.core.schema import NodeRelationship, RelatedNodeInfo, TextNode
+from llama_index.core.vector_stores import SimpleVectorStore
+from llama_index.core.vector_stores.types import VectorStoreQuery, VectorStoreQueryMode
+
+from vector_store import (
+    PERSIST_FNAME,
+    FastSimpleVectorStore,
+    QuantizedVectorStore,
+    _quantize,
+    _to_bf16,
+)
+
+DIM = 32
+
+
+@pytest.fixture(scope="module")
+def embeddings() -> np.ndarray:
+    return np.random.default_rng(0).normal(size=(500, DIM)).astype(np.float32)
+
+
+def _nodes(embeddings: np.ndarray) -> list[TextNode]:
+    return [
+        TextNode(id_=f"n{i}", text=f"node {i}", embedding=e.tolist())
+        for i, e in enumerate(embeddings)
+    ]
+
+
+def _query(q: np.ndarray, k: int = 5, node_ids: list[str] | None = None) -> VectorStoreQuery:
+    return VectorStoreQuery(query_embedding=q.tolist(), similarity_top_k=k, node_ids=node_ids)
+
+
+def test_to_bf16() -> None:
+    x = np.array([1.0, -2.5, 0.0, 2.0**100], dtype=np.float32)
+    widened = (_to_bf16(x).astype(np.uint32) << 16).view(np.float32)
+    # exactly representable values survive unchanged
+    np.testing.assert_array_equal(widened, x)
+    # values halfway between two BF16 neighbours round to the even one
+    halfway = np.array([1 + 2**-8, 1 + 3 * 2**-8], dtype=np.float32)
+    assert _to_bf16(halfway).tolist() == [0x3F80, 0x3F82]
+
+
+def test_to_bf16_relative_error(embeddings: np.ndarray) -> None:
+    widened = (_to_bf16(embeddings).astype(np.uint32) << 16).view(np.float32)
+    assert np.all(np.abs(widened - embeddings) <= np.abs(embeddings) * 2**-8)
+
+
+def test_quantize(embeddings: np.ndarray) -> None:
+    codes, scale = _quantize(embeddings)
+    assert codes.dtype == np.int8 and scale.dtype == np.float32
+    decoded = embeddings.min(axis=0) + (codes.astype(np.float32) + 128) * scale
+    assert np.all(np.abs(decoded - embeddings) <= scale / 2 + 1e-6)
+
+
+def test_quantize_constant_dimension() -> None:
+    embeddings = np.ones((4, 3), dtype=np.float32)
+    codes, scale = _quantize(embeddings)
+    assert np.all(scale == 1)
+    assert np.all(codes == -128)
+
+
+@pytest.fixture
+def store(embeddings: np.ndarray) -> QuantizedVectorStore:
+    # fewer candidates than rows, so queries go through the int8 shortlist
+    store = QuantizedVectorStore(candidates=50)
+    store.add(_nodes(embeddings))
+    return store
+
+
+def test_query_matches_exact_inner_product(
+    store: QuantizedVectorStore, embeddings: np.ndarray
+) -> None:
+    q = embeddings[7] + 0.1
+    result = store.query(_query(q))
+    expected = np.argsort(-(embeddings @ q))[:5]
+    assert result.ids == [f"n{i}" for i in expected]
+    np.testing.assert_allclose(result.similarities, (embeddings @ q)[expected], rtol=1e-5)
+
+
+def test_query_returns_nodes(store: QuantizedVectorStore, embeddings: np.ndarray) -> None:
+    result = store.query(_query(embeddings[7]))
+    assert [node.node_id for node in result.nodes] == result.ids
+    assert result.nodes[0].get_content() == "node 7"
+
+
+def test_query_node_ids(store: QuantizedVectorStore, embeddings: np.ndarray) -> None:
+    result = store.query(_query(embeddings[7], k=10, node_ids=["n1", "n2", "n3"]))
+    assert sorted(result.ids) == ["n1", "n2", "n3"]
+
+
+def test_query_rejects_filters(store: QuantizedVectorStore, embeddings: np.ndarray) -> None:
+    query = _query(embeddings[0])
+    query.filters = object()
+    with pytest.raises(NotImplementedError):
+        store.query(query)
+
+
+def test_query_rejects_unsupported_modes(
+    store: QuantizedVectorStore, embeddings: np.ndarray
+) -> None:
+    query = _query(embeddings[0])
+    query.mode = VectorStoreQueryMode.MMR
+    with pytest.raises(NotImplementedError):
+        store.query(query)
+
+
+def test_query_rejects_doc_ids(store: QuantizedVectorStore, embeddings: np.ndarray) -> None:
+    query = _query(embeddings[0])
+    query.doc_ids = ["doc"]
+    with pytest.raises(NotImplementedError):
+        store.query(query)
+
+
+def test_delete(store: QuantizedVectorStore, embeddings: np.ndarray) -> None:
+    q = embeddings[0] * 10
+    node = TextNode(
+        id_="extra",
+        text="extra node",
+        embedding=q.tolist(),
+        relationships={NodeRelationship.SOURCE: RelatedNodeInfo(node_id="doc")},
+    )
+    store.add([node])
+    assert store.query(_query(q, k=1)).ids == ["extra"]
+    store.delete("doc")
+    assert store.query(_query(q, k=1)).ids == ["n0"]
+
+
+def test_get_nodes(store: QuantizedVectorStore, embeddings: np.ndarray) -> None:
+    assert [n.get_content() for n in store.get_nodes(["n3", "n5"])] == ["node 3", "node 5"]
+    assert len(store.get_nodes()) == len(embeddings)
+    assert store.get_nodes(["missing"]) == []
+
+
+def test_persist_and_load(
+    store: QuantizedVectorStore, embeddings: np.ndarray, tmp_path
+) -> None:
+    store.persist(str(tmp_path / PERSIST_FNAME))
+    loaded = QuantizedVectorStore.from_persist_dir(str(tmp_path))
+    assert isinstance(loaded._embeddings, np.memmap)
+    assert isinstance(loaded._codes, np.memmap)
+    q = embeddings[42]
+    assert loaded.query(_query(q)).ids == store.query(_query(q)).ids
+
+
+def test_loaded_store_returns_nodes(
+    store: QuantizedVectorStore, embeddings: np.ndarray, tmp_path
+) -> None:
+    store.persist(str(tmp_path / PERSIST_FNAME))
+    loaded = QuantizedVectorStore.from_persist_dir(str(tmp_path))
+    assert [n.get_content() for n in loaded.query(_query(embeddings[42], k=1)).nodes] == [
+        "node 42"
+    ]
+
+
+def test_empty_store_persists_and_loads(tmp_path) -> None:
+    QuantizedVectorStore().persist(str(tmp_path / PERSIST_FNAME))
+    loaded = QuantizedVectorStore.from_persist_dir(str(tmp_path))
+    assert loaded.query(_query(np.ones(DIM, dtype=np.float32))).ids == []
+
+
+def test_persist_rejects_fs(store: QuantizedVectorStore, tmp_path) -> None:
+    with pytest.raises(NotImplementedError):
+        store.persist(str(tmp_path / PERSIST_FNAME), fs=object())
+
+
+def test_fast_simple_matches_simple(embeddings: np.ndarray) -> None:
+    fast, simple = FastSimpleVectorStore(), SimpleVectorStore()
+    fast.add(_nodes(embeddings))
+    simple.add(_nodes(embeddings))
+    q = embeddings[11] + 0.1
+    assert fast.query(_query(q)).ids == simple.query(_query(q)).ids
+    subset = ["n1", "n2", "n3", "n11"]
+    assert fast.query(_query(q, k=2, node_ids=subset)).ids == simple.query(
+        _query(q, k=2, node_ids=subset)
+    ).ids
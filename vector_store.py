@@ -0,0 +1,295 @@
+import json
+import os
+from typing import Any, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.constants import DATA_KEY
+from llama_index.core.schema import BaseNode
+from llama_index.core.storage.docstore.utils import doc_to_json, json_to_doc
+from llama_index.core.vector_stores.simple import (
+    DEFAULT_VECTOR_STORE,
+    NAMESPACE_SEP,
+    SimpleVectorStore,
+)
+from llama_index.core.vector_stores.types import (
+    DEFAULT_PERSIST_DIR,
+    DEFAULT_PERSIST_FNAME,
+    BasePydanticVectorStore,
+    VectorStoreQuery,
+    VectorStoreQueryMode,
+    VectorStoreQueryResult,
+)
+
+PERSIST_FNAME = f"{DEFAULT_VECTOR_STORE}{NAMESPACE_SEP}{DEFAULT_PERSIST_FNAME}"
+DEFAULT_PERSIST_PATH = os.path.join(DEFAULT_PERSIST_DIR, PERSIST_FNAME)
+EMBEDDINGS_FNAME = "emb.npy"
+CODES_FNAME = "codes.npy"
+SCALE_FNAME = "scale.npy"
+NODES_FNAME = "nodes.arrow"
+
+NODES_SCHEMA = pa.schema(
+    [("id", pa.string()), ("ref_doc_id", pa.string()), ("node", pa.string())]
+)
+
+# rows dequantized per BLAS call in the int8 scan, small enough to stay in cache
+SCAN_TILE_ROWS = 1024
+
+
+def _quantize(embeddings: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Per-dimension min/max scalar quantization to int8, returns (codes, scale)."""
+    if not len(embeddings):
+        return embeddings.astype(np.int8), np.ones(embeddings.shape[1], dtype=np.float32)
+    lo = embeddings.min(axis=0)
+    scale = (embeddings.max(axis=0) - lo) / 255
+    scale[scale == 0] = 1
+    codes = np.clip(np.rint((embeddings - lo) / scale - 128), -128, 127).astype(np.int8)
+    return codes, scale.astype(np.float32)
+
+
+def _to_bf16(x: np.ndarray) -> np.ndarray:
+    """FP32 -> BF16 bit patterns stored as uint16, rounding to nearest even."""
+    bits = np.ascontiguousarray(x, dtype=np.float32).view(np.uint32)
+    return ((bits + 0x7FFF + ((bits >> 16) & 1)) >> 16).astype(np.uint16)
+
+
+def _bf16_matvec(matrix: np.ndarray, q: np.ndarray) -> np.ndarray:
+    # widen one tile at a time so the FP32 temporary stays small
+    scores = np.empty(len(matrix), dtype=np.float32)
+    for start in range(0, len(matrix), SCAN_TILE_ROWS):
+        tile = matrix[start : start + SCAN_TILE_ROWS].astype(np.uint32) << 16
+        scores[start : start + len(tile)] = tile.view(np.float32) @ q
+    return scores
+
+
+def _node_to_json(node: BaseNode) -> str:
+    data = doc_to_json(node)
+    # the embedding already lives in the matrix, don't store it twice
+    data[DATA_KEY]["embedding"] = None
+    return json.dumps(data)
+
+
+class QuantizedVectorStore(BasePydanticVectorStore):
+    """Vector store that retrieves in two stages and persists to mmap-able files.
+
+    Embeddings are scalar-quantized to int8 per dimension, and a scan over
+    those codes shortlists `candidates` rows. The shortlist is then reranked
+    by the FP32 inner product against the query.
+
+    Nodes are kept in an Arrow table (id, ref_doc_id and the serialized node)
+    rather than the docstore. On load both the table and the matrices are
+    memory-mapped, and only the nodes returned by a query are deserialized.
+    """
+
+    stores_text: bool = True
+    candidates: int = 200
+
+    _nodes: Optional[pa.Table] = PrivateAttr(default=None)
+    _embeddings: Optional[np.ndarray] = PrivateAttr(default=None)
+    _codes: Optional[np.ndarray] = PrivateAttr(default=None)
+    _scale: Optional[np.ndarray] = PrivateAttr(default=None)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "QuantizedVectorStore"
+
+    @property
+    def client(self) -> None:
+        return None
+
+    @property
+    def _num_rows(self) -> int:
+        # not __len__: StorageContext tests stores for truthiness and would drop an empty one
+        return 0 if self._nodes is None else self._nodes.num_rows
+
+    def _set_rows(self, nodes: pa.Table, embeddings: np.ndarray) -> None:
+        self._nodes = nodes
+        self._embeddings = embeddings
+        # min/max are taken over the whole matrix, so codes are rebuilt on every change
+        self._codes, self._scale = _quantize(embeddings)
+
+    def _scan(self, q: np.ndarray) -> np.ndarray:
+        # E ~= lo + (codes + 128) * scale, so ranking by codes @ (scale * q)
+        # matches ranking the dequantized rows by their inner product with q
+        q_scaled = self._scale * q
+        scores = np.empty(len(self._codes), dtype=np.float32)
+        for start in range(0, len(self._codes), SCAN_TILE_ROWS):
+            tile = self._codes[start : start + SCAN_TILE_ROWS]
+            scores[start : start + len(tile)] = tile.astype(np.float32) @ q_scaled
+        return scores
+
+    def _rows_for(self, node_ids: list[str]) -> np.ndarray:
+        wanted = pc.is_in(self._nodes["id"], value_set=pa.array(node_ids, pa.string()))
+        return np.flatnonzero(wanted.to_numpy())
+
+    def get_nodes(
+        self, node_ids: Optional[list[str]] = None, filters: Any = None
+    ) -> list[BaseNode]:
+        if filters is not None:
+            raise NotImplementedError("metadata filters are not supported")
+        if not self._num_rows:
+            return []
+        rows = self._nodes if node_ids is None else self._nodes.take(self._rows_for(node_ids))
+        return [json_to_doc(json.loads(node)) for node in rows["node"].to_pylist()]
+
+    def add(self, nodes: list[BaseNode], **add_kwargs: Any) -> list[str]:
+        if not nodes:
+            return []
+        rows = pa.table(
+            {
+                "id": [node.node_id for node in nodes],
+                "ref_doc_id": [node.ref_doc_id for node in nodes],
+                "node": [_node_to_json(node) for node in nodes],
+            },
+            schema=NODES_SCHEMA,
+        )
+        new_embeddings = np.asarray([node.get_embedding() for node in nodes], dtype=np.float32)
+        if self._nodes is None:
+            self._set_rows(rows, new_embeddings)
+        else:
+            self._set_rows(
+                pa.concat_tables([self._nodes, rows]),
+                np.concatenate([self._embeddings, new_embeddings]),
+            )
+        return [node.node_id for node in nodes]
+
+    def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:
+        if self._nodes is None:
+            return
+        keep_mask = pc.fill_null(pc.not_equal(self._nodes["ref_doc_id"], ref_doc_id), True)
+        keep = np.flatnonzero(keep_mask.to_numpy())
+        self._set_rows(self._nodes.take(keep), self._embeddings[keep])
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        if query.mode != VectorStoreQueryMode.DEFAULT:
+            raise NotImplementedError(f"query mode {query.mode!r} is not supported")
+        if query.filters is not None:
+            raise NotImplementedError("metadata filters are not supported")
+        if query.doc_ids is not None:
+            raise NotImplementedError("doc_ids restriction is not supported")
+        if not self._num_rows:
+            return VectorStoreQueryResult(nodes=[], similarities=[], ids=[])
+
+        q = np.asarray(query.query_embedding, dtype=np.float32)
+
+        # like other stores, an empty node_ids list means no restriction
+        if query.node_ids and len(query.node_ids) < self._num_rows:
+            # an explicit subset is scored exactly, there is nothing to shortlist
+            shortlist = self._rows_for(query.node_ids)
+        elif self.candidates < self._num_rows:
+            # stage 1: approximate inner product over the int8 codes
+            approx = self._scan(q)
+            shortlist = np.argpartition(-approx, self.candidates - 1)[: self.candidates]
+        else:
+            shortlist = np.arange(self._num_rows)
+
+        # stage 2: exact inner product on the shortlisted rows only
+        scores = self._embeddings[shortlist] @ q
+        order = np.argsort(-scores)[: query.similarity_top_k]
+        hits = self._nodes.take(shortlist[order])
+        return VectorStoreQueryResult(
+            nodes=[json_to_doc(json.loads(node)) for node in hits["node"].to_pylist()],
+            similarities=scores[order].tolist(),
+            ids=hits["id"].to_pylist(),
+        )
+
+    def persist(self, persist_path: str = DEFAULT_PERSIST_PATH, fs: Any = None) -> None:
+        if fs is not None:
+            raise NotImplementedError("only the local filesystem is supported")
+        # written next to persist_path in formats that can be memory-mapped on load
+        persist_dir = os.path.dirname(persist_path)
+        os.makedirs(persist_dir, exist_ok=True)
+        if self._nodes is None:
+            self._set_rows(NODES_SCHEMA.empty_table(), np.empty((0, 0), np.float32))
+        np.save(os.path.join(persist_dir, EMBEDDINGS_FNAME), self._embeddings)
+        np.save(os.path.join(persist_dir, CODES_FNAME), self._codes)
+        np.save(os.path.join(persist_dir, SCALE_FNAME), self._scale)
+        with pa.OSFile(os.path.join(persist_dir, NODES_FNAME), "wb") as sink:
+            with pa.ipc.new_file(sink, NODES_SCHEMA) as writer:
+                writer.write_table(self._nodes)
+
+    @classmethod
+    def from_persist_dir(cls, persist_dir: str = DEFAULT_PERSIST_DIR) -> "QuantizedVectorStore":
+        store = cls()
+        source = pa.memory_map(os.path.join(persist_dir, NODES_FNAME), "r")
+        nodes = pa.ipc.open_file(source).read_all()
+        if not nodes.num_rows:
+            return store
+        store._nodes = nodes
+        # the matrices stay on disk too: the scan streams the int8 codes and only
+        # the FP32 rows reranked per query are paged in
+        store._embeddings = np.load(os.path.join(persist_dir, EMBEDDINGS_FNAME), mmap_mode="r")
+        store._codes = np.load(os.path.join(persist_dir, CODES_FNAME), mmap_mode="r")
+        store._scale = np.load(os.path.join(persist_dir, SCALE_FNAME))
+        return store
+
+
+class FastSimpleVectorStore(SimpleVectorStore):
+    """SimpleVectorStore whose default query mode scores every node in one matvec.
+
+    The stock store computes cosine similarity one node at a time in Python.
+    Here the embeddings are cached as an L2-normalized BF16 matrix (rebuilt
+    lazily after any mutation), half the bytes of FP32 for the memory-bound
+    scan. Scoring widens it to FP32 tile by tile for a BLAS `E @ q`, followed
+    by an argpartition for the top k. Persistence is unchanged, so it loads
+    directories written by SimpleVectorStore.
+    """
+
+    _ids: Optional[list[str]] = PrivateAttr(default=None)
+    _matrix: Optional[np.ndarray] = PrivateAttr(default=None)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "FastSimpleVectorStore"
+
+    def _normalized(self) -> tuple[list[str], np.ndarray]:
+        if self._matrix is None:
+            self._ids = list(self.data.embedding_dict)
+            matrix = np.asarray(list(self.data.embedding_dict.values()), dtype=np.float32)
+            if matrix.size:
+                matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+            self._matrix = _to_bf16(matrix)
+        return self._ids, self._matrix
+
+    def add(self, nodes: Any, **add_kwargs: Any) -> list[str]:
+        self._matrix = None
+        return super().add(nodes, **add_kwargs)
+
+    def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:
+        self._matrix = None
+        super().delete(ref_doc_id, **delete_kwargs)
+
+    def delete_nodes(self, *args: Any, **kwargs: Any) -> None:
+        self._matrix = None
+        super().delete_nodes(*args, **kwargs)
+
+    def clear(self) -> None:
+        self._matrix = None
+        super().clear()
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        if query.mode != VectorStoreQueryMode.DEFAULT or query.filters is not None:
+            return super().query(query, **kwargs)
+
+        ids, matrix = self._normalized()
+        if query.node_ids is not None and len(query.node_ids) < len(ids):
+            wanted = set(query.node_ids)
+            rows = np.array([i for i, id_ in enumerate(ids) if id_ in wanted], dtype=np.int64)
+        else:
+            rows = np.arange(len(ids))
+        if not len(rows):
+            return VectorStoreQueryResult(similarities=[], ids=[])
+
+        q = np.asarray(query.query_embedding, dtype=np.float32)
+        q /= max(float(np.linalg.norm(q)), 1e-12)
+        scores = _bf16_matvec(matrix[rows] if len(rows) < len(ids) else matrix, q)
+
+        k = min(query.similarity_top_k, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return VectorStoreQueryResult(
+            similarities=scores[top].tolist(),
+            ids=[ids[i] for i in rows[top]],
+        )